@@ -1,146 +1,243 @@
 import os
+import asyncio
+import functools
+import concurrent.futures
 import pathlib
 import hashlib
-import json
 import shutil
-import collections
+import typing
 
-from .models import MetaData, FileMetaData
+import httpx
+import orjson
+
+from .models import MetaData, FileMetaData, FileCache, GitHubCache, GitHubRelease, ReadmeData
 from .utils import (
+    KeywordTemplates,
     get_github_releases,
     make_readme_contributors,
     make_readme_extra,
     load_keyword_colors,
+    make_keyword_templates,
     load_keyword_files,
+    load_cache,
+    save_cache,
     convert_keywords,
 )
 
 
-def get_file_checksum(file_path: pathlib.Path, algorithm: str = "md5") -> str:
-    hash_alg = hashlib.new(algorithm)
-    with file_path.open("rb") as file:
-        for chunk in iter(lambda: file.read(4096), b""):
-            hash_alg.update(chunk)
-    return hash_alg.hexdigest()
+UTF8_BOM = b"\xef\xbb\xbf"
+# metadata.json consumers verify files against MD5 checksums
+CHECKSUM_ALGORITHM = "md5"
+
+T = typing.TypeVar("T")
+
+
+def walk_files(root: str | pathlib.Path, prefix: str = "") -> typing.Iterator[tuple[str, str]]:
+    with os.scandir(root) as entries:
+        for entry in entries:
+            rel_path = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk_files(entry.path, rel_path + "/")
+            elif entry.is_file():
+                yield entry.path, rel_path
+
+
+@functools.cache
+def make_dirs(path: str) -> None:
+    os.makedirs(path, exist_ok=True)
+
+
+def get_file_checksum(file_path: str | pathlib.Path, algorithm: str = CHECKSUM_ALGORITHM) -> str:
+    with open(file_path, "rb") as file:
+        return hashlib.file_digest(file, algorithm).hexdigest()
+
+
+def get_file_checksum_bytes(content: bytes, algorithm: str = CHECKSUM_ALGORITHM) -> str:
+    return hashlib.new(algorithm, content).hexdigest()
 
 
-def validate_json_file(file_path: pathlib.Path) -> bool:
+def strip_bom(content: bytes) -> bytes:
+    return content[len(UTF8_BOM):] if content.startswith(UTF8_BOM) else content
+
+
+def write_json_file(file_path: str | pathlib.Path, content: dict | list) -> None:
+    with open(file_path, "wb") as file:
+        file.write(UTF8_BOM + orjson.dumps(content, option=orjson.OPT_INDENT_2))
+
+
+def run_parallel(func: typing.Callable[..., T], items: list[tuple]) -> list[T]:
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        return list(executor.map(lambda item: func(*item), items))
+
+
+def is_copy_up_to_date(result_path: str, stat: os.stat_result) -> bool:
     try:
-        with file_path.open("r", encoding="utf-8-sig") as file:
-            json.load(file)
-        return True
-    except json.JSONDecodeError:
+        result_stat = os.stat(result_path)
+    except FileNotFoundError:
         return False
+    return result_stat.st_mtime_ns == stat.st_mtime_ns and result_stat.st_size == stat.st_size
 
 
-def dist_localization_data(metadata: MetaData, dist_path: pathlib.Path) -> None:
-    invalid_files = []
+def copy_file(file_path: str, result_path: str, metadata_path: str, file_cache: FileCache) -> FileMetaData:
+    stat = os.stat(file_path)
+    checksum = file_cache.get_checksum(metadata_path, stat)
 
-    localization_path = pathlib.Path(__file__).parents[1] / "localize"
-    keyword_colors = load_keyword_colors()
-    keyword_files = load_keyword_files()
+    if checksum is None or not is_copy_up_to_date(result_path, stat):
+        make_dirs(os.path.dirname(result_path))
+        shutil.copyfile(file_path, result_path)
+        os.utime(result_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    if checksum is None:
+        checksum = get_file_checksum(file_path)
+        file_cache.set_checksum(metadata_path, stat, checksum)
+
+    return FileMetaData(
+        path=metadata_path,
+        checksum=checksum
+    )
+
+
+def copy_localization_file(
+    file_path: str,
+    result_path: str,
+    metadata_path: str,
+    keyword_templates: KeywordTemplates,
+    keyword_files: list[str],
+    file_cache: FileCache,
+) -> FileMetaData | None:
+    # Converted files also depend on the keyword colors, so only plain copies are cached
+    is_keyword_file = os.path.basename(file_path) in keyword_files
+    stat = os.stat(file_path)
+
+    if not is_keyword_file:
+        checksum = file_cache.get_checksum(metadata_path, stat)
+        if checksum is not None and is_copy_up_to_date(result_path, stat):
+            return FileMetaData(path=metadata_path, checksum=checksum)
+
+    with open(file_path, "rb") as file:
+        buf = file.read()
 
-    for file in (localization_path / "RU").glob("**/*.json"):
-        if not file.is_file():
-            continue
+    try:
+        content = orjson.loads(strip_bom(buf))
+    except orjson.JSONDecodeError:
+        return None
+
+    make_dirs(os.path.dirname(result_path))
 
-        if not validate_json_file(file):
-            invalid_files.append(file)
-            continue
+    checksum = get_file_checksum_bytes(buf)
 
-        result_path = (dist_path / file.relative_to(localization_path)).parent
-        result_path.mkdir(parents=True, exist_ok=True)
+    if is_keyword_file:
+        convert_keywords(content, keyword_templates)
+        write_json_file(result_path, content)
 
-        if file.name in keyword_files:
-            content = file.read_text(encoding="utf-8-sig")
-            content = json.loads(content, object_pairs_hook=collections.OrderedDict)
-            convert_keywords(content, keyword_colors)
+    else:
+        with open(result_path, "wb") as file:
+            file.write(buf)
+        os.utime(result_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        file_cache.set_checksum(metadata_path, stat, checksum)
 
-            with (result_path / file.name).open("w", encoding="utf-8-sig") as f:
-                json.dump(content, f, ensure_ascii=False, indent=4)
+    return FileMetaData(
+        path=metadata_path,
+        checksum=checksum
+    )
 
-        else:
-            shutil.copy(file, result_path / file.name)
 
-        metadata.files.append(
-            FileMetaData(
-                path=file.relative_to(localization_path).as_posix(),
-                checksum=get_file_checksum(file)
-            )
+def dist_localization_data(metadata: MetaData, dist_path: pathlib.Path, file_cache: FileCache) -> None:
+    localization_path = pathlib.Path(__file__).parents[1] / "localize"
+    keyword_templates = make_keyword_templates(load_keyword_colors())
+    keyword_files = load_keyword_files()
+
+    result_root = os.path.join(dist_path, "RU")
+    items = [
+        (
+            file_path,
+            os.path.join(result_root, rel_path),
+            "RU/" + rel_path,
+            keyword_templates,
+            keyword_files,
+            file_cache,
         )
+        for file_path, rel_path in walk_files(localization_path / "RU")
+        if file_path.endswith(".json")
+    ]
+    results = run_parallel(copy_localization_file, items)
 
+    invalid_files = [item[0] for item, result in zip(items, results) if result is None]
     if invalid_files:
         raise ValueError(f"Invalid JSON files: {', '.join(map(str, invalid_files))}")
 
+    metadata.files.extend(results)
 
-def dist_sprites(metadata: MetaData, dist_path: pathlib.Path) -> None:
-    sprites_path = pathlib.Path(__file__).parents[1] / "sprites"
-
-    for file in sprites_path.glob("**/*"):
-        if not file.is_file():
-            continue
 
-        result_path = (dist_path / "Readme" / "Sprites" / file.relative_to(sprites_path)).parent
-        result_path.mkdir(parents=True, exist_ok=True)
-
-        shutil.copy(file, result_path / file.name)
+def dist_sprites(metadata: MetaData, dist_path: pathlib.Path, file_cache: FileCache) -> None:
+    sprites_path = pathlib.Path(__file__).parents[1] / "sprites"
 
-        metadata.files.append(
-            FileMetaData(
-                path=(pathlib.Path("Readme/Sprites") / file.relative_to(sprites_path)).as_posix(),
-                checksum=get_file_checksum(file)
-            )
+    result_root = os.path.join(dist_path, "Readme", "Sprites")
+    items = [
+        (
+            file_path,
+            os.path.join(result_root, rel_path),
+            "Readme/Sprites/" + rel_path,
+            file_cache,
         )
+        for file_path, rel_path in walk_files(sprites_path)
+    ]
+    metadata.files.extend(run_parallel(copy_file, items))
 
 
-def dist_extra_files(metadata: MetaData, dist_path: pathlib.Path) -> None:
+def dist_extra_files(metadata: MetaData, dist_path: pathlib.Path, file_cache: FileCache) -> None:
     extra_files_path = pathlib.Path(__file__).parents[1] / "extra"
 
-    for file in extra_files_path.glob("**/*"):
-        if not file.is_file():
-            continue
+    result_root = os.path.join(dist_path, "Readme")
+    items = [
+        (
+            file_path,
+            os.path.join(result_root, rel_path),
+            "Readme/" + rel_path,
+            file_cache,
+        )
+        for file_path, rel_path in walk_files(extra_files_path)
+    ]
+    metadata.files.extend(run_parallel(copy_file, items))
 
-        result_path = (dist_path / "Readme" / file.relative_to(extra_files_path)).parent
-        result_path.mkdir(parents=True, exist_ok=True)
 
-        shutil.copy(file, result_path / file.name)
+async def fetch_readme_data(cache_path: pathlib.Path) -> tuple[ReadmeData, list[GitHubRelease]]:
+    cache = load_cache(GitHubCache, cache_path)
 
-        metadata.files.append(
-            FileMetaData(
-                path=(pathlib.Path("Readme") / file.relative_to(extra_files_path)).as_posix(),
-                checksum=get_file_checksum(file)
-            )
+    async with httpx.AsyncClient() as client:
+        contributors, releases_info = await asyncio.gather(
+            make_readme_contributors(client, [
+                "kimght/LimbusStory",
+                "kimght/LimbusLocalizeRU",
+            ], cache),
+            get_github_releases(client, "kimght/LimbusCompanyRuMTL", cache),
         )
 
+    save_cache(cache, cache_path)
+    return contributors, releases_info
+
 
 def dist_readme(metadata: MetaData, dist_path: pathlib.Path) -> None:
     readme_path = pathlib.Path(__file__).parents[1] / "readme"
 
-    with open(readme_path / "readme_template.json", "r", encoding="utf-8-sig") as file:
-        readme_template = json.load(file)
+    readme_template = orjson.loads(strip_bom((readme_path / "readme_template.json").read_bytes()))
 
-    contributors = make_readme_contributors([
-        "kimght/LimbusStory",
-        "kimght/LimbusLocalizeRU",
-    ])
+    contributors, releases_info = asyncio.run(fetch_readme_data(dist_path / ".github-cache.json"))
 
     readme_template["noticeList"].append(contributors.export(1193, 1))
 
     extra = make_readme_extra()
     readme_template["noticeList"].append(extra.export(1194, 1))
 
-    releases_info = get_github_releases("kimght/LimbusCompanyRuMTL")
-    releases_notices = []
-    for i, release in enumerate(releases_info, 2911):
-        readme_data = release.make_readme()
-        releases_notices.append(readme_data.export(i + 1))
-
-    readme_template["noticeList"].extend(releases_notices[::-1])
+    releases_notices = [
+        release.make_readme().export(i + 1)
+        for i, release in enumerate(releases_info, 2911)
+    ]
+    readme_template["noticeList"].extend(reversed(releases_notices))
     result_path = dist_path / "Readme"
     result_path.mkdir(parents=True, exist_ok=True)
 
-    with open(result_path / "Readme.json", "w", encoding="utf-8-sig") as file:
-        json.dump(readme_template, file, ensure_ascii=False, indent=4)
+    write_json_file(result_path / "Readme.json", readme_template)
 
     metadata.files.append(
         FileMetaData(
@@ -157,13 +254,18 @@ def main() -> None:
     if not dist_path.exists():
         dist_path.mkdir()
 
-    dist_localization_data(metadata, dist_path)
-    dist_sprites(metadata, dist_path)
-    dist_extra_files(metadata, dist_path)
+    file_cache_path = dist_path / ".hashcache.json"
+    file_cache = load_cache(FileCache, file_cache_path)
+
+    dist_localization_data(metadata, dist_path, file_cache)
+    dist_sprites(metadata, dist_path, file_cache)
+    dist_extra_files(metadata, dist_path, file_cache)
     dist_readme(metadata, dist_path)
 
-    with (dist_path / "metadata.json").open("w", encoding="utf-8") as file:
-        json.dump(metadata.model_dump(), file, indent=2)
+    file_cache.retain({file["path"] for file in metadata.files})
+    save_cache(file_cache, file_cache_path)
+
+    (dist_path / "metadata.json").write_bytes(orjson.dumps(metadata.export(), option=orjson.OPT_INDENT_2))
 
     print("Localization distribution created successfully.")
 
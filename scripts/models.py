@@ -1,4 +1,5 @@
 import datetime
+import os
 import json
 import typing
 import pydantic
@@ -100,11 +101,49 @@ class GitHubRelease(pydantic.BaseModel):
         )
 
 
-class FileMetaData(pydantic.BaseModel):
+class FileMetaData(typing.TypedDict):
     path: str
     checksum: str
 
 
 class MetaData(pydantic.BaseModel):
     version: str
-    files: list[FileMetaData] = pydantic.Field(default_factory=list)
+    # FileMetaData entries, kept as plain dicts to skip per-file model validation
+    files: list[dict[str, str]] = pydantic.Field(default_factory=list)
+
+    def export(self) -> dict:
+        return {
+            "version": self.version,
+            "files": self.files,
+        }
+
+
+class GitHubCacheEntry(pydantic.BaseModel):
+    etag: str
+    data: typing.Any
+
+
+class GitHubCache(pydantic.BaseModel):
+    entries: dict[str, GitHubCacheEntry] = pydantic.Field(default_factory=dict)
+
+
+class FileCacheEntry(pydantic.BaseModel):
+    mtime_ns: int
+    size: int
+    checksum: str
+
+
+class FileCache(pydantic.BaseModel):
+    entries: dict[str, FileCacheEntry] = pydantic.Field(default_factory=dict)
+
+    def get_checksum(self, key: str, stat: os.stat_result) -> str | None:
+        entry = self.entries.get(key)
+        if entry is None or entry.mtime_ns != stat.st_mtime_ns or entry.size != stat.st_size:
+            return None
+        return entry.checksum
+
+    def set_checksum(self, key: str, stat: os.stat_result, checksum: str) -> None:
+        self.entries[key] = FileCacheEntry(mtime_ns=stat.st_mtime_ns, size=stat.st_size, checksum=checksum)
+
+    def retain(self, keys: set[str]) -> None:
+        self.entries = {key: entry for key, entry in self.entries.items() if key in keys}
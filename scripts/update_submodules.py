@@ -1,8 +1,12 @@
 import os
-import configparser
+import asyncio
+import re
 import httpx
 from base64 import b64decode
 
+GITMODULES_SECTION = re.compile(r"^\[submodule\s+\"[^\"]*\"\][ \t]*\r?$((?:\n(?!\s*\[).*)*)", re.MULTILINE)
+GITMODULES_OPTION = re.compile(r"^\s*(\w+)\s*=\s*(.*?)\s*$", re.MULTILINE)
+
 
 def get_env_variables() -> tuple[str, str, str]:
     github_token = os.getenv("GITHUB_TOKEN")
@@ -37,20 +41,20 @@ def fetch_gitmodules(github_token: str, repo_owner: str, repo_name: str) -> str:
 
 
 def parse_gitmodules(gitmodules_content: str) -> dict[str, dict[str, str]]:
-    config = configparser.ConfigParser()
-    config.read_string(gitmodules_content)
-
     submodules = {}
-    for section in config.sections():
-        path = config.get(section, "path")
-        url = config.get(section, "url")
-        branch = config.get(section, "branch", fallback="main")
+    for section in GITMODULES_SECTION.finditer(gitmodules_content):
+        options = dict(GITMODULES_OPTION.findall(section.group(1)))
+        path = options["path"]
+        url = options["url"]
+        branch = options.get("branch", "main")
         submodules[path] = {"url": url, "branch": branch}
 
     return submodules
 
 
-def get_latest_commit_sha(submodule_info: dict[str, str], github_token: str) -> str:
+async def get_latest_commit_sha(
+    client: httpx.AsyncClient, submodule_info: dict[str, str], github_token: str
+) -> str:
     url = submodule_info["url"]
     branch = submodule_info["branch"]
 
@@ -65,7 +69,7 @@ def get_latest_commit_sha(submodule_info: dict[str, str], github_token: str) ->
         "Accept": "application/vnd.github.v3+json",
     }
 
-    response = httpx.get(api_url, headers=headers)
+    response = await client.get(api_url, headers=headers)
     if response.status_code != 200:
         raise Exception(
             f"Failed to get latest commit for submodule {submodule_name} on branch {branch}. Error: {response.text}"
@@ -75,6 +79,18 @@ def get_latest_commit_sha(submodule_info: dict[str, str], github_token: str) ->
     return latest_commit_sha
 
 
+async def get_latest_commit_shas(
+    submodules: dict[str, dict[str, str]], github_token: str
+) -> list[str]:
+    async with httpx.AsyncClient() as client:
+        return await asyncio.gather(
+            *(
+                get_latest_commit_sha(client, submodule_info, github_token)
+                for submodule_info in submodules.values()
+            )
+        )
+
+
 def create_tree_with_submodule_updates(
     submodules: dict[str, dict[str, str]],
     base_tree_sha: str,
@@ -82,9 +98,10 @@ def create_tree_with_submodule_updates(
     repo_owner: str,
     repo_name: str,
 ) -> str:
+    latest_commit_shas = asyncio.run(get_latest_commit_shas(submodules, github_token))
+
     tree = []
-    for path, submodule_info in submodules.items():
-        latest_commit_sha = get_latest_commit_sha(submodule_info, github_token)
+    for path, latest_commit_sha in zip(submodules, latest_commit_shas):
         tree.append(
             {
                 "path": path,
@@ -1,39 +1,68 @@
+import asyncio
+import itertools
+import pathlib
+import typing
 import httpx
-import collections
+import pydantic
 import re
 
-from .models import GitHubRelease, ReadmeData, ReadmeBody, ReadmeBodyElement, ReadmeSubTitle, ReadmeText, ReadmeLink
+from .models import GitHubCache, GitHubCacheEntry, GitHubRelease, ReadmeData, ReadmeBody, ReadmeBodyElement, ReadmeSubTitle, ReadmeText, ReadmeLink
 
 KEYWORD_SHORTHAND = re.compile(r"\[(?P<keyword_id>[a-zA-Z0-9_]+?)\:'(?P<text>.+?)'\]")
 
 
-def get_github_releases(repo: str) -> list[GitHubRelease]:
-    url = f"https://api.github.com/repos/{repo}/releases"
-    response = httpx.get(url)
+CacheT = typing.TypeVar("CacheT", bound=pydantic.BaseModel)
+
+
+def load_cache(model: type[CacheT], path: pathlib.Path) -> CacheT:
+    try:
+        return model.model_validate_json(path.read_bytes())
+    except (FileNotFoundError, pydantic.ValidationError):
+        return model()
+
+
+def save_cache(cache: pydantic.BaseModel, path: pathlib.Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(cache.model_dump_json(), encoding="utf-8")
+
+
+async def get_github_json(client: httpx.AsyncClient, url: str, cache: GitHubCache) -> typing.Any:
+    cached = cache.entries.get(url)
+    headers = {"If-None-Match": cached.etag} if cached is not None else {}
+
+    response = await client.get(url, headers=headers)
+    if response.status_code == 304 and cached is not None:
+        return cached.data
     response.raise_for_status()
 
     data = response.json()
+    if "ETag" in response.headers:
+        cache.entries[url] = GitHubCacheEntry(etag=response.headers["ETag"], data=data)
+
+    return data
+
+
+async def get_github_releases(client: httpx.AsyncClient, repo: str, cache: GitHubCache) -> list[GitHubRelease]:
+    url = f"https://api.github.com/repos/{repo}/releases"
+    data = await get_github_json(client, url, cache)
     releases = [GitHubRelease(**release) for release in data[::-1]]
 
     return releases
 
 
-def get_github_contributors(repo: str) -> list[str]:
+async def get_github_contributors(client: httpx.AsyncClient, repo: str, cache: GitHubCache) -> list[str]:
     url = f"https://api.github.com/repos/{repo}/contributors"
-    response = httpx.get(url)
-    response.raise_for_status()
-
-    data = response.json()
+    data = await get_github_json(client, url, cache)
     contributors = [contributor["login"] for contributor in data if contributor["type"] == "User"]
 
     return contributors
 
 
-def make_readme_contributors(repos: list[str]) -> ReadmeData:
-    contributors = []
-    for repo in repos:
-        contributors += get_github_contributors(repo)
-    contributors = sorted(set(contributors))
+async def make_readme_contributors(client: httpx.AsyncClient, repos: list[str], cache: GitHubCache) -> ReadmeData:
+    repos_contributors = await asyncio.gather(
+        *(get_github_contributors(client, repo, cache) for repo in repos)
+    )
+    contributors = sorted(set(itertools.chain.from_iterable(repos_contributors)))
 
     content: list[ReadmeBodyElement] = [
         ReadmeSubTitle(value="Участники проекта", size=49),
@@ -86,39 +115,51 @@ def make_readme_extra() -> ReadmeData:
         )
     )
 
-def replace_shorthands(text: str, keyword_colors: dict[str, str]) -> str:
+def make_keyword_template(keyword_id: str, color: str) -> str:
+    return (
+        f"<sprite name=\"{keyword_id}\">"
+        f"<color={color}>"
+        f"<u>"
+        f"<link=\"{keyword_id}\">"
+        f"%s"
+        f"</link>"
+        f"</u>"
+        f"</color>"
+    )
+
+
+class KeywordTemplates(dict[str, str]):
+    def __missing__(self, keyword_id: str) -> str:
+        print(f"Unknown keyword ID: {keyword_id}!")
+        template = self[keyword_id] = make_keyword_template(keyword_id, "#f8c200")
+        return template
+
+
+def make_keyword_templates(keyword_colors: dict[str, str]) -> KeywordTemplates:
+    return KeywordTemplates(
+        (keyword_id, make_keyword_template(keyword_id, color))
+        for keyword_id, color in keyword_colors.items()
+    )
+
+
+def replace_shorthands(text: str, keyword_templates: KeywordTemplates) -> str:
     def make_replacement(match: re.Match) -> str:
-        keyword_id = match.group("keyword_id")
-        text = match.group("text")
-
-        if keyword_id in keyword_colors:
-            color = keyword_colors[keyword_id]
-        else:
-            print(f"Unknown keyword ID: {keyword_id}!")
-            color = "#f8c200"
-
-        return (
-            f"<sprite name=\"{keyword_id}\">"
-            f"<color={color}>"
-            f"<u>"
-            f"<link=\"{keyword_id}\">"
-            f"{text}"
-            f"</link>"
-            f"</u>"
-            f"</color>"
-        )
+        keyword_id, text = match.group("keyword_id", "text")
+        return keyword_templates[keyword_id] % text
 
     return KEYWORD_SHORTHAND.sub(make_replacement, text)
 
 
-def convert_keywords(data: collections.OrderedDict | list, keyword_colors: dict[str, str]) -> None:
-    if isinstance(data, collections.OrderedDict):
-        items = data.items()
-    else:
-        items = enumerate(data)
+def convert_keywords(data: dict | list, keyword_templates: KeywordTemplates) -> None:
+    stack = [data]
+
+    while stack:
+        node = stack.pop()
+        items = node.items() if type(node) is dict else enumerate(node)
 
-    for key, value in items:
-        if isinstance(value, (collections.OrderedDict, list)):
-            convert_keywords(value, keyword_colors)
-        elif isinstance(value, str):
-            data[key] = replace_shorthands(value, keyword_colors)
+        for key, value in items:
+            value_type = type(value)
+            if value_type is dict or value_type is list:
+                stack.append(value)
+            elif value_type is str and "[" in value:
+                node[key] = replace_shorthands(value, keyword_templates)